@@ -1,46 +1,109 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import folium
-from streamlit_folium import folium_static
-import matplotlib.pyplot as plt
+import streamlit.components.v1 as components
 
-# Load the dataset
+# Crime Severity Score Calculation
+crime_weights = {
+    'murder': 5,
+    'rape': 4,
+    'kidnapping & abduction': 4,
+    'robbery': 3,
+    'burglary': 3,
+    'dowry deaths': 3
+}
+max_possible = sum(500 * weight for weight in crime_weights.values())
+
+# Load the dataset (normalized offline by scripts/normalize_data.py)
 @st.cache_data
 def load_crime_data():
-    return pd.read_pickle('crime_data.pkl')
+    df = pd.read_parquet('crime_data.parquet', columns=list(crime_weights))
+    df['weighted'] = df[list(crime_weights)].to_numpy() @ np.array(list(crime_weights.values()))
+    return df
 
 @st.cache_data
 def load_location_data():
-    return pd.read_pickle('state_district_lat_long.pkl')
+    return pd.read_parquet('state_district_lat_long.parquet')
 
 crime_data = load_crime_data()
 location_data = load_location_data()
 
-crime_data['state/ut'] = crime_data['state/ut'].str.title()
-crime_data['district'] = crime_data['district'].str.title()
-location_data['State'] = location_data['State'].str.title()
-location_data['District'] = location_data['District'].str.title()
+@st.cache_resource
+def location_index():
+    return {
+        state: group.set_index('District')[['Latitude', 'Longitude']]
+        for state, group in location_data.groupby('State', observed=True, sort=False)
+    }
 
-# Crime Severity Score Calculation
-crime_weights = {
-    'murder': 5,
-    'rape': 4,
-    'kidnapping & abduction': 4,
-    'robbery': 3,
-    'burglary': 3,
-    'dowry deaths': 3
-}
+@st.cache_data
+def severity_table():
+    return (
+        crime_data.groupby(level=['state/ut', 'district', 'year'], observed=True)['weighted'].sum()
+        .div(max_possible).mul(100).round(2)
+    )
+
+@st.cache_data
+def state_breakdown(state):
+    return (
+        severity_table().xs(state, level='state/ut')
+        .unstack('year', fill_value=0.0)
+        .reindex(columns=[2024], fill_value=0.0)[2024]
+        .to_dict()
+    )
+
+@st.cache_data
+def district_trend(state, district):
+    return (
+        severity_table().xs((state, district), level=['state/ut', 'district'])
+        .reindex([2022, 2023, 2024], fill_value=0.0)
+    )
+
+@st.cache_data
+def state_list():
+    return crime_data.index.unique('state/ut').tolist()
+
+# Crime Severity Map, rendered once per state
+@st.cache_data
+def render_state_map_html(state):
+    state_location = location_index().get(state)
+    if state_location is None:
+        return None
+
+    latitude, longitude = state_location.iloc[0]
+    m = folium.Map(location=[latitude, longitude], zoom_start=7)
 
-def calculate_crime_severity(df):
-    weighted_sum = sum(df[col].sum() * weight for col, weight in crime_weights.items())
-    max_possible = sum(500 * weight for weight in crime_weights.values())
-    crime_index = (weighted_sum / max_possible) * 100 if max_possible > 0 else 0
-    return round(crime_index, 2)
+    df_severity = pd.DataFrame(state_breakdown(state).items(), columns=['District', 'Crime Severity Index'])
+    severities = df_severity['Crime Severity Index']
+    df_severity['Color'] = np.select([severities < 25, severities <= 55], ['green', 'orange'], default='red')
+    markers = df_severity.join(state_location, on='District', how='inner')
+    features = [
+        {
+            'type': 'Feature',
+            'id': district,
+            'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+            'properties': {'color': color, 'popup': f"{district}: {severity}"},
+        }
+        for district, severity, color, lat, lon in markers.itertuples(index=False)
+    ]
+    if features:
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': features},
+            marker=folium.CircleMarker(radius=10, fill=True),
+            style_function=lambda feature: {
+                'color': feature['properties']['color'],
+                'fillColor': feature['properties']['color'],
+                'fillOpacity': 0.7,
+            },
+            popup=folium.GeoJsonPopup(fields=['popup'], labels=False),
+        ).add_to(m)
+
+    return folium.Figure().add_child(m).render()
 
 # State Selection Page
 def state_input_page():
     st.title("🌍 Crime Data Analysis & Safety Insights")
-    state = st.selectbox('Select State/UT:', crime_data['state/ut'].unique())
+    state = st.selectbox('Select State/UT:', state_list())
     
     if st.button('Show Crime Severity Map'):
         if state:
@@ -54,42 +117,14 @@ def crime_analysis_page():
     st.title("🔍 Crime Data Analysis for Selected State")
     
     state = st.session_state.state
-    filtered_data = crime_data[crime_data['state/ut'] == state]
-    
-    district_severity = {}
-    trend_data = {}
-    for district in filtered_data['district'].unique():
-        district_data = filtered_data[filtered_data['district'] == district]
-        district_severity[district] = calculate_crime_severity(district_data[district_data['year'] == 2024])
-        trend_data[district] = {
-            year: calculate_crime_severity(district_data[district_data['year'] == year])
-            for year in [2022, 2023, 2024]
-        }
+    district_severity = state_breakdown(state)
     
     # Display Crime Severity Map
     st.subheader(f'Crime Severity Index for Districts in {state}')
     
-    state_location = location_data[location_data['State'] == state]
-    if not state_location.empty:
-        latitude, longitude = state_location.iloc[0]['Latitude'], state_location.iloc[0]['Longitude']
-        m = folium.Map(location=[latitude, longitude], zoom_start=7)
-
-        for district, severity in district_severity.items():
-            district_row = location_data[(location_data['State'] == state) & (location_data['District'] == district)]
-            if not district_row.empty:
-                lat, lon = district_row.iloc[0]['Latitude'], district_row.iloc[0]['Longitude']
-                color = 'green' if severity < 25 else 'orange' if severity <= 55 else 'red'
-                folium.CircleMarker(
-                    location=[lat, lon],
-                    radius=10,
-                    color=color,
-                    fill=True,
-                    fill_color=color,
-                    fill_opacity=0.7,
-                    popup=f"{district}: {severity}"
-                ).add_to(m)
-        
-        folium_static(m)
+    map_html = render_state_map_html(state)
+    if map_html is not None:
+        components.html(map_html, width=700, height=510)
     else:
         st.warning("Coordinates for the selected state were not found.")
     
@@ -105,7 +140,8 @@ def crime_analysis_page():
     
     # Display Crime Severity Trend
     st.subheader("Crime Severity Trend (2022 - 2024)")
-    st.line_chart(pd.DataFrame(trend_data[selected_district], index=["Crime Severity Index"]).T)
+    trend_data = district_trend(state, selected_district)
+    st.line_chart(trend_data.rename_axis(None).to_frame("Crime Severity Index"))
     
     if crime_severity_index < 25:
         st.markdown("<div class='success-alert'>🟢 This area is relatively safe.</div>", unsafe_allow_html=True)
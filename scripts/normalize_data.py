@@ -0,0 +1,34 @@
+# One-off preprocessing for the app's data files, so app.py can load them
+# without any string rewriting. Title-cases state and district names and
+# stores them as categoricals, downcasts crime counts to int16 and sorts
+# crime_data by (state/ut, district, year). Safe to re-run on files that
+# are already normalized. Run from anywhere: python scripts/normalize_data.py
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+CRIME_PATH = ROOT / 'crime_data.parquet'
+LOCATION_PATH = ROOT / 'state_district_lat_long.parquet'
+CRIME_KEYS = ['state/ut', 'district', 'year']
+
+def normalize_crime_data(df):
+    df = df.reset_index().drop(columns='index', errors='ignore')
+    df['state/ut'] = df['state/ut'].astype(str).str.title().astype('category')
+    df['district'] = df['district'].astype(str).str.title().astype('category')
+    counts = [col for col in df.columns if col not in CRIME_KEYS]
+    limits = np.iinfo('int16')
+    if df[counts].min().min() < limits.min or df[counts].max().max() > limits.max:
+        raise ValueError(f"crime counts do not fit in int16 ({limits.min}..{limits.max})")
+    df = df.astype({col: 'int16' for col in counts})
+    return df.set_index(CRIME_KEYS).sort_index()
+
+def normalize_location_data(df):
+    df['State'] = df['State'].astype(str).str.title().astype('category')
+    df['District'] = df['District'].astype(str).str.title().astype('category')
+    return df
+
+if __name__ == '__main__':
+    normalize_crime_data(pd.read_parquet(CRIME_PATH)).to_parquet(CRIME_PATH, compression='zstd')
+    normalize_location_data(pd.read_parquet(LOCATION_PATH)).to_parquet(LOCATION_PATH, compression='zstd', index=False)